@@ -46,6 +46,19 @@ class DataFormat(object):
     def reference(self):
         return self._reference
 
+    def rebind(self, pytorch_tensor):
+        """ Point this wrapper at another PyTorch tensor of the same
+        shape/dtype, updating the pointer in place instead of building a
+        new wrapper object.
+        """
+        if not pytorch_tensor.is_contiguous():
+            raise Exception(
+                "Cannot cast incontiguous tensor, please use tensor.detach().clone().contiguous() before casting."
+            )
+        self._pointer = ctypes.cast(pytorch_tensor.storage().data_ptr(),
+                                    self._pointer_type)
+        self._reference = pytorch_tensor
+
 
 def cast_pytorch_tensor(pytorch_tensor):
     if not pytorch_tensor.is_contiguous():
@@ -54,8 +67,9 @@ def cast_pytorch_tensor(pytorch_tensor):
         )
     tensor_addr = pytorch_tensor.storage().data_ptr()
     shape = pytorch_tensor.shape
-    dtype = str(pytorch_tensor.dtype).split(".")[-1]
-    pointer_type = ctypes.POINTER(dtypes.str2type[dtype].c_type)
+    type_entry = dtypes.torch2type[pytorch_tensor.dtype]
+    dtype = type_entry.type_str
+    pointer_type = ctypes.POINTER(type_entry.c_type)
     pointer = ctypes.cast(tensor_addr, pointer_type)
     reference = pytorch_tensor
     return DataFormat(pointer, pointer_type, shape, dtype, reference)
@@ -39,3 +39,15 @@ str2type = {
     "uint64":
     TypeObject._make(["uint8", ctypes.c_uint64, None, numpy.uint64]),
 }
+
+# direct torch.dtype lookup, avoids parsing str(tensor.dtype) on every
+# tensor description/cast
+torch2type = {
+    torch.float32: str2type["float32"],
+    torch.float64: str2type["double"],
+    torch.int8: str2type["int8"],
+    torch.int16: str2type["int16"],
+    torch.int32: str2type["int32"],
+    torch.int64: str2type["int64"],
+    torch.uint8: str2type["uint8"],
+}
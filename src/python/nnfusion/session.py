@@ -3,28 +3,51 @@
 
 from __future__ import print_function
 import os
-import copy
+import re
+import shutil
+import inspect
+import hashlib
 import tempfile
+import concurrent.futures
 import torch
 import json
 import logging
-from .dtypes import str2type
-from .utils import cd, execute
-from .executor import Executor
+from itertools import chain
+from .dtypes import str2type, torch2type
+from .utils import cd, execute, execute_async, wait_execution
+from .executor import Executor, find_nnf_rt
 from .description import IODescription, ModelDescription
 from .data_format import cast_pytorch_tensor
 
 logger = logging.getLogger(__name__)
 
+# process-wide CUDA memory pool shared by all PTSession output buffers, so
+# many sessions don't each fragment the caching allocator with private
+# segments; created lazily, stays None on torch without MemPool support
+_shared_mem_pool = None
+
+
+def get_shared_mem_pool():
+    global _shared_mem_pool
+    if _shared_mem_pool is None and hasattr(torch.cuda, "MemPool") and hasattr(
+            torch.cuda, "use_mem_pool"):
+        _shared_mem_pool = torch.cuda.MemPool()
+    return _shared_mem_pool
+
 
 def tensor2desc(pt_tensor, name=""):
     shape = tuple(pt_tensor.shape)
-    dtype = str2type[str(pt_tensor.dtype).split(".")[-1]].type_str
+    dtype = torch2type[pt_tensor.dtype].type_str
     return IODescription(name, shape, dtype)
 
 
 def generate_sample(desc, device=None):
     size = [s if isinstance(s, (int)) else 1 for s in desc.shape]
+    if device == "meta":
+        # zero-byte placeholder, enough for shape-only tracing
+        return torch.empty(size,
+                           dtype=str2type[desc.dtype].torch_type,
+                           device="meta")
     if desc.num_classes:
         return torch.randint(0,
                              desc.num_classes,
@@ -36,59 +59,258 @@ def generate_sample(desc, device=None):
 
 
 def generate_output_desc(model, input_desc, device="cpu"):
-    fake_inputs = [generate_sample(desc, device) for desc in input_desc]
-    model_copy = copy.deepcopy(model).to(device)
-    out = model_copy(*fake_inputs)
+    # prefer a forward on the meta device: no memory allocated, no kernel
+    # launched, only shapes/dtypes are propagated
+    out = None
+    functional_call = getattr(getattr(torch, "func", None), "functional_call",
+                              None)
+    if functional_call is not None:
+        fake_inputs = [generate_sample(desc, "meta") for desc in input_desc]
+        meta_state = {
+            name: torch.empty_like(tensor, device="meta")
+            for name, tensor in model.state_dict().items()
+        }
+        try:
+            out = functional_call(model, meta_state, tuple(fake_inputs))
+        except Exception:
+            logger.debug(
+                "Meta-device shape inference failed, fallback to real forward",
+                exc_info=True)
+            out = None
+    if out is None:
+        fake_inputs = [generate_sample(desc, device) for desc in input_desc]
+        # shape/dtype inference doesn't mutate weights, run the origin model
+        # under no_grad instead of deep-copying it
+        model.to(device)
+        with torch.no_grad():
+            out = model(*fake_inputs)
     if isinstance(out, torch.Tensor):
         out = (out, )
     return tuple(tensor2desc(t, name=f"output_{i}") for i, t in enumerate(out))
 
 
-def convert_model_to_onnx(model, model_desc, device, file_name, const_folding):
+def _onnx_export_supports(param):
+    try:
+        return param in inspect.signature(torch.onnx.export).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+# protobuf cannot serialize a message over 2 GB, leave headroom for the graph
+_ONNX_EXTERNAL_DATA_THRESHOLD = 3 << 29
+
+
+def _needs_external_data(model):
+    num_bytes = sum(tensor.numel() * tensor.element_size()
+                    for tensor in model.state_dict().values())
+    return num_bytes >= _ONNX_EXTERNAL_DATA_THRESHOLD
+
+
+def _consolidate_external_data(file_name):
+    # the legacy exporter scatters one file per tensor next to the model,
+    # gather them into a single weights.bin written via onnx
+    try:
+        import onnx
+    except ImportError:
+        return
+    onnx_model = onnx.load(file_name)
+    onnx.save_model(onnx_model,
+                    file_name,
+                    save_as_external_data=True,
+                    all_tensors_to_one_file=True,
+                    location="weights.bin",
+                    size_threshold=1024)
+
+
+def convert_model_to_onnx(model,
+                          model_desc,
+                          device,
+                          file_name,
+                          const_folding,
+                          dynamo=False):
     model.to(device)
     input_names = [input.name for input in model_desc.inputs]
     output_names = [output.name for output in model_desc.outputs]
     sample_inputs = [
         generate_sample(input, device) for input in model_desc.inputs
     ]
+    external_data = _needs_external_data(model)
+    if dynamo and _onnx_export_supports("dynamo"):
+        # torch.export based path: no TorchScript tracing, no model re-run
+        # for shape inference; const_folding is intentionally ignored here,
+        # the onnx-script optimizer below const-folds the exported graph.
+        # Opt-in only: it emits opset >= 18 graphs, and the NNFusion onnx
+        # frontend registers converters with opset <= 12 semantics, so this
+        # path is for callers exporting to other consumers
+        export_kwargs = {}
+        if _onnx_export_supports("optimize"):
+            export_kwargs["optimize"] = True
+        if external_data and _onnx_export_supports("external_data"):
+            export_kwargs["external_data"] = True
+        torch.onnx.export(model,
+                          tuple(sample_inputs),
+                          file_name,
+                          input_names=input_names,
+                          output_names=output_names,
+                          dynamo=True,
+                          **export_kwargs)
+        return model
+
     sample_outputs = [
         generate_sample(output, device) for output in model_desc.outputs
     ]
-    # note: onnx exporter might have side effect, so copy a new model
-    torch.onnx.export(copy.deepcopy(model).to(device),
-                      tuple(sample_inputs),
-                      file_name,
-                      input_names=input_names,
-                      output_names=output_names,
-                      opset_version=12,
-                      _retain_param_name=True,
-                      example_outputs=tuple(sample_outputs),
-                      do_constant_folding=const_folding)
+    # note: onnx exporter might have side effect, so snapshot weights on cpu
+    # and restore them afterwards instead of deep-copying the whole model
+    state_backup = {
+        name: tensor.detach().to("cpu", copy=True)
+        for name, tensor in model.state_dict().items()
+    }
+    export_kwargs = {}
+    if external_data and _onnx_export_supports("use_external_data_format"):
+        # keep weights out of the protobuf, it cannot hold 2 GB+ models
+        export_kwargs["use_external_data_format"] = True
+    try:
+        torch.onnx.export(model,
+                          tuple(sample_inputs),
+                          file_name,
+                          input_names=input_names,
+                          output_names=output_names,
+                          opset_version=12,
+                          _retain_param_name=True,
+                          example_outputs=tuple(sample_outputs),
+                          do_constant_folding=const_folding,
+                          **export_kwargs)
+    finally:
+        model.load_state_dict(state_backup)
+    if export_kwargs.get("use_external_data_format"):
+        _consolidate_external_data(file_name)
 
     return model
 
 
-def codegen(model_path, flags, output_dir):
+def _onnx_export_fingerprint(model, model_desc, const_folding, dynamo):
+    desc2key = lambda desc: (desc.name, desc.shape, desc.dtype, desc.
+                             num_classes)
+    meta = {
+        "state": [(name, tuple(tensor.shape), str(tensor.dtype))
+                  for name, tensor in sorted(model.state_dict().items())],
+        "inputs": [desc2key(desc) for desc in model_desc.inputs],
+        "outputs": [desc2key(desc) for desc in model_desc.outputs],
+        "opset": 12,
+        "const_folding": const_folding,
+        "dynamo": dynamo,
+    }
+    return hashlib.sha256(json.dumps(meta, sort_keys=True).encode()).hexdigest()
+
+
+def _patch_cached_onnx(model, file_name, fingerprint):
+    fingerprint_file = file_name + ".fingerprint"
+    if not (os.path.isfile(file_name) and os.path.isfile(fingerprint_file)):
+        return False
+    with open(fingerprint_file) as f:
+        if f.read().strip() != fingerprint:
+            return False
+    if _needs_external_data(model):
+        # the cached export keeps weights in external files; reloading and
+        # re-serializing it inline would hit the 2 GB protobuf limit
+        return False
+    try:
+        import onnx
+    except ImportError:
+        return False
+    try:
+        onnx_model = onnx.load(file_name, load_external_data=False)
+        state = dict(model.state_dict())
+        for init in onnx_model.graph.initializer:
+            if init.data_location == onnx.TensorProto.EXTERNAL:
+                return False
+            tensor = state.pop(init.name, None)
+            if tensor is None:
+                # graph constant not tied to a weight, keep as exported
+                continue
+            raw_data = tensor.detach().cpu().contiguous().numpy().tobytes()
+            if len(init.raw_data) != len(raw_data):
+                # layout diverged from the cached export, re-trace
+                return False
+            init.raw_data = raw_data
+        if state:
+            # weights with no matching initializer (e.g. renamed) would
+            # leave stale bytes in the cached graph, re-trace
+            return False
+        onnx.save(onnx_model, file_name)
+    except Exception:
+        logger.debug("Patching cached onnx export %s failed, re-exporting",
+                     file_name,
+                     exc_info=True)
+        return False
+    return True
+
+
+def export_model_to_onnx(model,
+                         model_desc,
+                         device,
+                         file_name,
+                         const_folding,
+                         dynamo=False):
+    """
+    Export model to onnx like convert_model_to_onnx, but when file_name holds
+    a previous export of the same graph (same state_dict layout, descriptions
+    and export options), refresh its weight initializers in place instead of
+    re-tracing the model. Const-folded exports are always re-traced since
+    folded constants would keep stale weight values.
+    """
+    fingerprint = _onnx_export_fingerprint(model, model_desc, const_folding,
+                                           dynamo)
+    if not const_folding and _patch_cached_onnx(model, file_name, fingerprint):
+        logger.info("Reuse cached onnx export %s", file_name)
+        return model
+    convert_model_to_onnx(model, model_desc, device, file_name, const_folding,
+                          dynamo)
+    with open(file_name + ".fingerprint", "w") as f:
+        f.write(fingerprint)
+    return model
+
+
+def codegen(model_path, flags, output_dir, block=True):
     model_path = os.path.abspath(model_path)
-    with cd(output_dir):
-        command = "{} {} {}".format("nnfusion", model_path, flags)
-        execute(command)
+    command = "{} {} {}".format("nnfusion", model_path, flags)
+    process = execute_async(command, cwd=output_dir)
+    if block:
+        return wait_execution(process)
+    return process
 
 
 def modify_nnfusion_rt(rt_dir):
-    with cd(rt_dir):
-        # remove cudaDevice reset in cuda_init()
-        command = "sed -i '/cudaDeviceReset()/s:^://:'" + " " + "nnfusion_rt.cu"
-        execute(command)
+    # comment out cudaDeviceReset in cuda_init(), in-process instead of
+    # forking a sed subprocess
+    rt_file = os.path.join(rt_dir, "nnfusion_rt.cu")
+    with open(rt_file) as f:
+        source = f.read()
+    source = re.sub(r"^(.*cudaDeviceReset\(\))",
+                    r"//\1",
+                    source,
+                    flags=re.MULTILINE)
+    with open(rt_file, "w") as f:
+        f.write(source)
 
 
 def build(rt_dir):
     with cd(rt_dir):
-        command = "cmake ."
-        execute([command])
+        if shutil.which("ninja"):
+            command = "cmake -G Ninja"
+            if shutil.which("ccache"):
+                command += (" -DCMAKE_CXX_COMPILER_LAUNCHER=ccache"
+                            " -DCMAKE_CUDA_COMPILER_LAUNCHER=ccache")
+            execute(command + " .")
+
+            command = "ninja -j{}".format(os.cpu_count())
+            execute(command)
+        else:
+            command = "cmake ."
+            execute(command)
 
-        command = "make -j"
-        execute(command)
+            command = "make -j"
+            execute(command)
 
 
 class PTSession(object):
@@ -106,6 +328,11 @@ class PTSession(object):
                  const_folding=False,
                  build_nnf=True,
                  codegen_flags=None,
+                 artifact_cache_dir="~/.cache/nnfusion",
+                 use_cuda_graph=False,
+                 output_arena=None,
+                 release_cached_memory=False,
+                 precision="fp32",
                  **kwargs):
         """
         Parameters:
@@ -120,20 +347,33 @@ class PTSession(object):
             model_format: Intermedia model format, currently only support "onnx".
             const_folding: Do constant folding when converting model to onnx
             build_nnf: build nnf
-            codegen_flags: NNFusion codegen flags, 
+            codegen_flags: NNFusion codegen flags,
                 ref: https://github.com/microsoft/nnfusion/wiki/4.3-NNFusion-CLI-Interface#cli-flags
+            artifact_cache_dir: Optional, a string path to a folder caching compiled
+                NNFusion runtimes keyed by model weights/descriptions/flags, so that
+                identical sessions skip onnx export, codegen and build.
+                Set None to always rebuild.
+            use_cuda_graph: Not supported yet, must be False. Capturing the
+                kernel sequence into a CUDA Graph needs the runtime to launch
+                on a caller-supplied stream, but kernel_entry launches on the
+                runtime's own streams which a torch-side capture cannot
+                record.
+            output_arena: Optional, a torch.cuda.MemPool to allocate output
+                buffers from, overriding the process-wide shared pool.
+            release_cached_memory: Run torch.cuda.empty_cache() once session
+                construction finished. Off by default: releasing segments to
+                the driver forces later allocations back through cudaMalloc,
+                which is costly when building many sessions in a loop.
+            precision: Model precision, currently only "fp32". Lower
+                precisions are rejected until the onnx frontend can import
+                them: int8 quantizers emit operators (DynamicQuantizeLinear,
+                MatMulInteger, ConvInteger) NNFusion doesn't register, and
+                the runtime has no bf16 tensor type.
         """
         self._model = model
         if model_format != "onnx":
             raise Exception("{} format not supported yet".format(model_format))
         self._model_format = model_format
-        self._torch_weights = {
-            name: param
-            for name, param in self._model.named_parameters()
-        }
-        self._torch_weights.update(
-            {name: param
-             for name, param in self._model.named_buffers()})
         self._input_desc = input_desc
         self._device = device
         if output_desc is not None:
@@ -156,26 +396,63 @@ class PTSession(object):
 
         self._const_folding = const_folding
         self._build_nnf = build_nnf
-        # convert torch model to onnx
-        if self._build_nnf:
-            self._onnx_model_path = os.path.join(self._workdir, "nnf.onnx")
-            convert_model_to_onnx(self._model, self._model_desc, self._device,
-                                  self._onnx_model_path, self._const_folding)
-        else:
-            self._onnx_model_path = ""
-        torch.cuda.empty_cache()
 
-        # codegen
+        # codegen flags
         self._codegen_flags = {"extern_result_memory": 1}
         self._codegen_flags.update(codegen_flags or {})
         if self._codegen_flags.get("training_mode",
                                    False) and self._const_folding:
             raise Exception("Const folding and training mode are incompatible")
+
+        # precision
+        if precision == "int8":
+            raise Exception(
+                "precision int8 not supported yet: onnx quantizers emit "
+                "operators the NNFusion onnx frontend doesn't register")
+        elif precision == "bf16":
+            raise Exception(
+                "precision bf16 not supported yet: the NNFusion runtime "
+                "has no bf16 tensor type")
+        elif precision != "fp32":
+            raise Exception(
+                "precision {} not supported yet".format(precision))
+        self._precision = precision
+
+        # cuda graph capture
+        if use_cuda_graph:
+            raise Exception(
+                "use_cuda_graph not supported yet: kernel_entry launches on "
+                "the runtime's own streams, which a torch-side capture "
+                "cannot record")
+        self._output_arena = output_arena
+
+        # compiled artifact cache
+        if artifact_cache_dir:
+            self._artifact_cache_dir = os.path.expandvars(
+                os.path.expanduser(artifact_cache_dir))
+            self._cache_key = self._compute_cache_key()
+        else:
+            self._artifact_cache_dir = None
+            self._cache_key = None
+        self._rt_restored = self._build_nnf and self._restore_cached_rt()
+
+        # convert torch model to onnx
+        if self._build_nnf and not self._rt_restored:
+            self._onnx_model_path = os.path.join(self._workdir, "nnf.onnx")
+            export_model_to_onnx(self._model, self._model_desc, self._device,
+                                 self._onnx_model_path, self._const_folding)
+        else:
+            self._onnx_model_path = ""
+
         self._create_executor()
+        if release_cached_memory:
+            # after outputs are allocated, so freed segments can be reused
+            # by the next session instead of going back to the driver
+            torch.cuda.empty_cache()
 
-    def _create_executor(self):
+    def _get_rt_dir(self):
         if "cuda" in self._device:
-            rt_dir = os.path.join(self._workdir, "nnfusion_rt/cuda_codegen")
+            return os.path.join(self._workdir, "nnfusion_rt/cuda_codegen")
         elif "cpu" in self._device:
             raise Exception("CPU not supported yet")
         elif "rocm" in self._device:
@@ -184,27 +461,132 @@ class PTSession(object):
         else:
             raise Exception("Unknown device {}".format(self._device))
 
-        if self._build_nnf:
+    def _compute_cache_key(self):
+        hasher = hashlib.sha256()
+        for name, tensor in sorted(self._model.state_dict().items()):
+            hasher.update(name.encode())
+            hasher.update(
+                tensor.detach().cpu().contiguous().numpy().tobytes())
+        desc2key = lambda desc: (desc.name, desc.shape, desc.dtype, desc.
+                                 num_classes)
+        meta = {
+            "inputs": [desc2key(desc) for desc in self._input_desc],
+            "outputs": [desc2key(desc) for desc in self._output_desc],
+            "flags": sorted(
+                (str(k), str(v)) for k, v in self._codegen_flags.items()),
+            "model_format": self._model_format,
+            "const_folding": self._const_folding,
+            "precision": self._precision,
+        }
+        hasher.update(json.dumps(meta, sort_keys=True).encode())
+        nnf_bin = shutil.which("nnfusion")
+        if nnf_bin:
+            hasher.update(str(os.path.getmtime(nnf_bin)).encode())
+        return hasher.hexdigest()
+
+    def _workdir_cache_key_file(self):
+        return os.path.join(self._workdir, "nnfusion_rt", ".nnf_cache_key")
+
+    def _read_workdir_cache_key(self):
+        key_file = self._workdir_cache_key_file()
+        if not os.path.isfile(key_file):
+            return None
+        with open(key_file) as f:
+            return f.read().strip()
+
+    def _write_workdir_cache_key(self):
+        with open(self._workdir_cache_key_file(), "w") as f:
+            f.write(self._cache_key)
+
+    def _restore_cached_rt(self):
+        if self._cache_key is None:
+            return False
+        cached_rt = os.path.join(self._artifact_cache_dir, self._cache_key,
+                                 "nnfusion_rt")
+        rt_dir = self._get_rt_dir()
+        if os.path.isdir(rt_dir) and find_nnf_rt(rt_dir) != "":
+            # only trust a runtime already sitting in the workdir when it
+            # records the key it was built from, otherwise a reused workdir
+            # would silently execute a stale engine
+            if self._read_workdir_cache_key() == self._cache_key:
+                return True
+        cached_device_rt = os.path.join(cached_rt, os.path.basename(rt_dir))
+        if not os.path.isdir(cached_device_rt) or find_nnf_rt(
+                cached_device_rt) == "":
+            return False
+        dst = os.path.join(self._workdir, "nnfusion_rt")
+        if os.path.exists(dst):
+            shutil.rmtree(dst)
+        shutil.copytree(cached_rt, dst)
+        self._write_workdir_cache_key()
+        logger.info("Reuse cached NNFusion runtime %s", cached_rt)
+        return True
+
+    def _store_cached_rt(self):
+        if self._cache_key is None:
+            return
+        # stamp the freshly built tree so a later session reusing this
+        # workdir can tell whether it matches
+        self._write_workdir_cache_key()
+        cached_dir = os.path.join(self._artifact_cache_dir, self._cache_key)
+        if os.path.exists(cached_dir):
+            return
+        os.makedirs(self._artifact_cache_dir, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(prefix=".nnf_cache_",
+                                   dir=self._artifact_cache_dir)
+        try:
+            shutil.copytree(os.path.join(self._workdir, "nnfusion_rt"),
+                            os.path.join(tmp_dir, "nnfusion_rt"))
+            os.rename(tmp_dir, cached_dir)
+        except OSError:
+            # concurrent writer won the rename, drop our copy
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def _create_executor(self):
+        rt_dir = self._get_rt_dir()
+
+        if self._build_nnf and not self._rt_restored:
             flags_str = "-f {} ".format(self._model_format)
             flags_str += " ".join([
                 "-f{}={}".format(k, v) for k, v in self._codegen_flags.items()
             ])
-            codegen(self._onnx_model_path, flags_str, self._workdir)
+            process = codegen(self._onnx_model_path,
+                              flags_str,
+                              self._workdir,
+                              block=False)
+            # nnfusion_rt.cu is still being streamed out while codegen runs,
+            # the source patch has to wait for process exit
+            wait_execution(process)
             modify_nnfusion_rt(rt_dir)
             build(rt_dir)
+            pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+            store_future = pool.submit(self._store_cached_rt)
+            pool.shutdown(wait=False)
+        else:
+            store_future = None
 
         self._executor = Executor(rt_dir)
+        # cache population copies the whole built tree, overlap it with the
+        # runtime load/init above and join before returning
+        if store_future is not None:
+            store_future.result()
 
         nnf_inputs = self._executor.get_inputs()
         nnf_outputs = self._executor.get_outputs()
         real_inputs = {desc.name: desc for desc in self._input_desc}
         real_outputs = {desc.name: desc for desc in self._output_desc}
+        # weights resolved from the live module only for the wiring below,
+        # no session-held dict keeps them pinned afterwards
+        torch_weights = dict(self._named_weights())
         if self._codegen_flags.get("training_mode", False):
-            for name, tensor in self._torch_weights.items():
+            for name, tensor in torch_weights.items():
                 assert name not in real_inputs, f"Duplicate inputs {name}"
                 real_inputs[name] = tensor2desc(tensor, name=name)
         self._inputs = {}
         self._outputs = {}
+        # last-seen (data_ptr, shape) per input, to skip re-wrapping tensors
+        # whose storage didn't move between calls
+        self._input_versions = {}
         for desc in nnf_inputs:
             # Note: Not all inputs are consumed
             assert desc.name in real_inputs, f"nnf requires input {desc.name}, but it doesn\'t exist in session input desc"
@@ -214,15 +596,54 @@ class PTSession(object):
             assert desc.dtype == real_inputs[
                 desc.
                 name].dtype, f"nnf requires input {desc.name} with type {desc.dtype}, but session input desc is {real_inputs[desc.name].dtype}"
-            if desc.name in self._torch_weights:
+            if desc.name in torch_weights:
                 self._inputs[desc.name] = cast_pytorch_tensor(
-                    self._torch_weights[desc.name])
+                    torch_weights[desc.name])
             else:
                 self._inputs[desc.name] = None
 
         if bool(self._codegen_flags.get("extern_result_memory")) is not True:
             raise Exception("Please add extern_result_memory to codegen flags")
 
+        if self._output_arena is not None:
+            pool = self._output_arena
+        else:
+            pool = get_shared_mem_pool() if "cuda" in self._device else None
+        if pool is not None:
+            # use_mem_pool needs a concrete index, plain "cuda" has none
+            pool_device = torch.device(self._device)
+            if pool_device.index is None:
+                pool_device = torch.device(pool_device.type,
+                                           torch.cuda.current_device())
+            with torch.cuda.use_mem_pool(pool, device=pool_device):
+                self._allocate_outputs(nnf_outputs, real_outputs)
+        else:
+            self._allocate_outputs(nnf_outputs, real_outputs)
+        self._build_feed_plan()
+
+    def _build_feed_plan(self):
+        # positional signature/params arrays in kernel_entry slot order,
+        # prefilled from the construction-time wiring; run_by_nnf updates
+        # only slots whose tensor moved and hands the arrays straight to
+        # feed_pointers, skipping the dict walk and shape re-checks of
+        # Executor.feed_data (inputs/outputs were validated above)
+        num_inputs = len(self._executor.get_inputs())
+        num_outputs = len(self._executor.get_outputs())
+        self._feed_signature = [None] * (num_inputs + num_outputs)
+        self._feed_params = [None] * (num_inputs + num_outputs)
+        self._input_slots = {}
+        for name, data_format in self._inputs.items():
+            index = self._executor.input_index[name]
+            self._input_slots[name] = index
+            if data_format is not None:
+                self._feed_signature[index] = data_format.pointer_type
+                self._feed_params[index] = data_format.pointer
+        for name, data_format in self._outputs.items():
+            index = num_inputs + self._executor.output_index[name]
+            self._feed_signature[index] = data_format.pointer_type
+            self._feed_params[index] = data_format.pointer
+
+    def _allocate_outputs(self, nnf_outputs, real_outputs):
         for desc in nnf_outputs:
             assert self._codegen_flags.get(
                 "training_mode", False
@@ -234,8 +655,10 @@ class PTSession(object):
                 assert desc.dtype == real_outputs[
                     desc.
                     name].dtype, f"nnf requires output {desc.name} with shape {desc.shape}, but session output desc is {real_outputs[desc.name].shape}"
+            # empty instead of zeros: the runtime overwrites every output
+            # buffer before it's read, the fill kernel is wasted work
             self._outputs[desc.name] = cast_pytorch_tensor(
-                torch.zeros(desc.shape,
+                torch.empty(desc.shape,
                             dtype=str2type[desc.dtype].torch_type,
                             device=self._device))
 
@@ -258,26 +681,63 @@ class PTSession(object):
             a list of PyTorch tensors executed by NNFusion,
             they should be the same as origin PyTorch model forward results.
         """
+        slots = self._input_slots
+        versions = self._input_versions
+        signature = self._feed_signature
+        params = self._feed_params
         for name, tensor in feed_data.items():
             # TODO: check all inputs are presented in single forward
-            if name in self._inputs:
-                self._inputs[name] = cast_pytorch_tensor(tensor)
-        self._executor(self._inputs, self._outputs)
+            index = slots.get(name)
+            if index is None:
+                continue
+            version = (tensor.data_ptr(), tuple(tensor.shape))
+            if versions.get(name) == version:
+                continue
+            data_format = self._inputs[name]
+            if data_format is not None and data_format.shape == tuple(
+                    tensor.shape) and data_format.dtype == torch2type[
+                        tensor.dtype].type_str:
+                # recycle the wrapper, only the pointer moved; shape and
+                # dtype were validated when the wrapper was installed
+                data_format.rebind(tensor)
+            else:
+                data_format = cast_pytorch_tensor(tensor)
+                desc = self._executor.input_descs[index]
+                if data_format.shape != desc.shape or data_format.dtype != desc.dtype:
+                    raise Exception(
+                        f"Shape or type mismatch for NNFusion model input {name}, expect [{desc.shape}, {desc.dtype}], feed [{data_format.shape}, {data_format.dtype}]"
+                    )
+                self._inputs[name] = data_format
+                signature[index] = data_format.pointer_type
+            versions[name] = version
+            params[index] = data_format.pointer
+        self._executor.feed_pointers(signature, params)
         if check_nan and self.is_weights_nan():
             raise Exception("Nan found after execution")
         return [
             self._outputs[desc.name].reference for desc in self._output_desc
         ]
 
+    def _named_weights(self):
+        # iterate the live module so weight swaps (e.g. a reloaded
+        # state_dict) are observed without a session rebuild
+        return chain(self._model.named_parameters(),
+                     self._model.named_buffers())
+
     def is_weights_nan(self):
-        have_nan = False
-        for name, weight in self._torch_weights.items():
-            if bool(torch.isnan(weight).any()) or bool(
-                    torch.isinf(weight).any()):
+        weights = list(self._named_weights())
+        if not weights:
+            return False
+        # one isfinite kernel per tensor and a single host sync, instead of
+        # isnan + isinf kernels and a blocking bool() per tensor; weights of
+        # different dtypes cannot be flattened into one reduction
+        flags = torch.stack([weight.isfinite().all() for _, weight in weights])
+        if bool(flags.all()):
+            return False
+        for (name, _), finite in zip(weights, flags.tolist()):
+            if not finite:
                 logger.error("Nan or inf found in {}".format(name))
-                # logger.error(weight)
-                have_nan = True
-        return have_nan
+        return True
 
 
 if __name__ == "__main__":
@@ -31,4 +31,29 @@ def execute(command, redirect_stderr=True, shell=True, **kwargs):
     except subprocess.CalledProcessError as e:
         logger.error(e.output)
         raise e
-    return output
\ No newline at end of file
+    return output
+
+
+def execute_async(command, redirect_stderr=True, shell=True, **kwargs):
+    """
+    Launch command without blocking, return the subprocess.Popen handle.
+    Join it with wait_execution to collect output and check the exit code.
+    """
+    logger.debug(command)
+    stderr = subprocess.STDOUT if redirect_stderr else None
+    return subprocess.Popen(command,
+                            stdout=subprocess.PIPE,
+                            stderr=stderr,
+                            shell=shell,
+                            encoding="utf8",
+                            **kwargs)
+
+
+def wait_execution(process):
+    output, _ = process.communicate()
+    if process.returncode != 0:
+        logger.error(output)
+        raise subprocess.CalledProcessError(process.returncode,
+                                            process.args,
+                                            output=output)
+    return output